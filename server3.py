@@ -1,9 +1,15 @@
 import asyncio
 import websockets
+try:
+    from websockets.frames import Frame, Opcode
+    from websockets.protocol import State
+except ImportError:  # Older websockets without the frames API
+    Frame = None
 import threading
 import bge
 import socket
-import json
+import orjson
+import zlib
 import math
 import mathutils    
 
@@ -11,85 +17,166 @@ clients = set()
 selected_object = None
 reported_errors = set()  # To keep track of reported errors
 mouse_visible = True
+prop_name_cache = {}  # id(obj) -> tuple of game property names
+last_objects_hash = 0  # Hash of the last object-name list broadcast
+obj_by_name = {}  # name -> KX_GameObject, rebuilt when the object list changes
+last_props = {}  # Properties broadcast on the previous tick
+last_props_name = None  # Which object last_props belongs to
+
+
+def diff_properties(old, new):
+    # Shallow diff per section; most fields (mass, scale, game props)
+    # are unchanged between ticks, so only send what moved
+    diff = {}
+    for section, values in new.items():
+        old_values = old.get(section)
+        if isinstance(values, dict) and isinstance(old_values, dict):
+            changed = {k: v for k, v in values.items() if old_values.get(k) != v}
+            if changed:
+                diff[section] = changed
+        elif values != old_values:
+            diff[section] = values
+    return diff
+
+
+def get_object_by_name(name):
+    # scene.objects.get is a linear scan inside BGE; the cache makes
+    # repeat lookups O(1). Fall back to the scan when the cache is cold
+    # or the cached proxy was freed (e.g. a game-logic restart that the
+    # name-list hash can't see)
+    obj = obj_by_name.get(name)
+    if obj is not None and not obj.invalid:
+        return obj
+    obj = bge.logic.getCurrentScene().objects.get(name)
+    if obj:
+        obj_by_name[name] = obj
+    else:
+        obj_by_name.pop(name, None)
+    return obj
 
 
 def truncate(value, digits=3):
-    if isinstance(value, float):
+    # Hot path: runs for every scalar in every property payload, and
+    # floats dominate, so check the exact type before anything else
+    t = type(value)
+    if t is float:
         return round(value, digits)
-    elif isinstance(value, (list, mathutils.Vector, mathutils.Euler)):
+    if t is list or t is mathutils.Vector or t is mathutils.Euler:
         return [truncate(v, digits) for v in value]
     return value
 
-async def broadcast_data():
+# Folded radians->degrees factor; one multiply per axis instead of a
+# math.degrees call
+RAD2DEG = 180.0 / math.pi
+
+# Fixed responses; orjson returns immutable bytes, so serialize them once
+UPDATE_SUCCESS_PAYLOAD = orjson.dumps({"type": "update_success"})
+GAME_RESTARTED_PAYLOAD = orjson.dumps({"type": "game_restarted"})
+GAME_ENDED_PAYLOAD = orjson.dumps({"type": "game_ended"})
+PHYSICS_DEBUG_UNAVAILABLE_PAYLOAD = orjson.dumps({"type": "error", "message": "Physics debug visualization is not available in this version of UPBGE"})
+
+# Reusable message envelopes; rebinding "data" in place avoids a fresh
+# wrapper dict per broadcast (safe: encoded before the next rebind)
+OBJECTS_TMPL = {"type": "objects", "data": None}
+PROPERTIES_TMPL = {"type": "object_properties", "data": None}
+PROPERTIES_DELTA_TMPL = {"type": "object_properties_delta", "data": None}
+
+# Payloads larger than this get compressed once before broadcasting,
+# instead of letting permessage-deflate re-compress per client
+COMPRESS_THRESHOLD = 1024
+
+def encode_payload(message):
+    payload = orjson.dumps(message)
+    if len(payload) > COMPRESS_THRESHOLD:
+        payload = zlib.compress(payload, 1)
+    return payload
+
+async def client_writer(websocket):
+    # Long-lived writer per client: broadcasts are queued with put_nowait
+    # instead of spawning a send task per client per tick
     while True:
-        if clients:
-            scene = bge.logic.getCurrentScene()
-            objects = [{"name": obj.name} for obj in scene.objects]
-            object_list_message = json.dumps({"type": "objects", "data": objects})
-            
-            # Broadcast object list
-            await asyncio.gather(*[client.send(object_list_message) for client in clients])
-            
-            # Broadcast selected object properties if one is selected
-            if selected_object:
-                obj = scene.objects.get(selected_object)
-                if obj:
-                    properties = {
-                        "position": list(obj.worldPosition),
-                        "rotation": list(obj.worldOrientation.to_euler()),
-                        "scale": list(obj.worldScale),
-                        "mass": obj.mass,
-                        "linearVelocity": list(obj.linearVelocity),
-                        "angularVelocity": list(obj.angularVelocity)
-                    }
-                    for key in obj.getPropertyNames():
-                        properties[key] = obj[key]
-                    properties_message = json.dumps({"type": "object_properties", "data": properties})
-                    await asyncio.gather(*[client.send(properties_message) for client in clients])
-        
-        await asyncio.sleep(0.5)  # Update twice per second
+        payload = await websocket.out_q.get()
+        try:
+            await websocket.send(payload)
+        except websockets.exceptions.ConnectionClosed:
+            # Peer went away mid-send; handle_client cleans up the rest
+            break
 
-async def handle_client(websocket, path):
+BROADCAST_BATCH_SIZE = 50
+
+async def broadcast_payload(payload):
+    # Serialize the websocket frame once; per-client cost then drops to
+    # a transport write of the shared bytes instead of re-framing the
+    # same payload inside every send()
+    framed = Frame(Opcode.BINARY, payload).serialize(mask=False) if Frame else None
+
+    clients_list = list(clients)
+    for i in range(0, len(clients_list), BROADCAST_BATCH_SIZE):
+        for client in clients_list[i:i + BROADCAST_BATCH_SIZE]:
+            if (framed is not None and client.out_q.empty()
+                    and client.transport is not None and not client._paused
+                    and client.state is State.OPEN):
+                # Idle writable client: push the pre-framed bytes directly
+                client.transport.write(framed)
+                continue
+            try:
+                client.out_q.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Slow client; drop this frame, the next tick sends fresh state
+                pass
+        # Yield between batches so new connections and incoming
+        # messages make progress during a large sweep
+        await asyncio.sleep(0)
+
+async def select_object(websocket, data):
     global selected_object
+    selected_object = data['name']
+    await send_object_properties(websocket, data['name'])
+
+# Message type -> handler, so routing is one dict lookup instead of a
+# string-comparison cascade per message
+MESSAGE_HANDLERS = {
+    'get_objects': lambda ws, data: send_objects(ws),
+    'get_object_properties': select_object,
+    'update_object_property': lambda ws, data: update_object_property(ws, data),
+    'toggle_visibility': lambda ws, data: toggle_object_visibility(ws, data['object']),
+    'get_game_info': lambda ws, data: send_game_info(ws),
+    'set_game_speed': lambda ws, data: set_game_speed(ws, data['speed']),
+    'toggle_physics_debug': lambda ws, data: toggle_physics_debug(ws),
+    'toggle_mouse': lambda ws, data: toggle_mouse(ws),
+    'restart_game': lambda ws, data: restart_game(ws),
+    'end_game': lambda ws, data: end_game(ws),
+}
+
+async def handle_client(websocket, path):
+    websocket.out_q = asyncio.Queue(maxsize=32)
+    writer_task = asyncio.create_task(client_writer(websocket))
     clients.add(websocket)
     try:
         async for message in websocket:
-            data = json.loads(message)
-            if data['type'] == 'get_objects':
-                await send_objects(websocket)
-            elif data['type'] == 'get_object_properties':
-                selected_object = data['name']
-                await send_object_properties(websocket, data['name'])
-            elif data['type'] == 'update_object_property':
-                await update_object_property(websocket, data)
-            elif data['type'] == 'toggle_visibility':
-                await toggle_object_visibility(websocket, data['object'])
-            elif data['type'] == 'get_game_info':
-                await send_game_info(websocket)
-            elif data['type'] == 'set_game_speed':
-                await set_game_speed(websocket, data['speed'])
-            elif data['type'] == 'toggle_physics_debug':
-                await toggle_physics_debug(websocket)
-            elif data['type'] == 'toggle_mouse':
-                await toggle_mouse(websocket)
-            elif data['type'] == 'restart_game':
-                await restart_game(websocket)
-            elif data['type'] == 'end_game':
-                await end_game(websocket)
+            data = orjson.loads(message)
+            handler = MESSAGE_HANDLERS.get(data['type'])
+            if handler:
+                await handler(websocket, data)
     except websockets.exceptions.ConnectionClosedError:
         print("Client connection closed")
     finally:
         clients.remove(websocket)
+        writer_task.cancel()
 
 
 async def toggle_object_visibility(websocket, object_name):
-    scene = bge.logic.getCurrentScene()
-    obj = scene.objects.get(object_name)
+    obj = get_object_by_name(object_name)
     if obj:
-        obj.visible = not obj.visible
-        await websocket.send(json.dumps({"type": "visibility_updated", "object": object_name, "visible": obj.visible}))
+        try:
+            obj.visible = not obj.visible
+            await websocket.send(orjson.dumps({"type": "visibility_updated", "object": object_name, "visible": obj.visible}))
+        except Exception as e:
+            # A cached object may have been removed since the last rebuild
+            obj_by_name.pop(object_name, None)
+            await websocket.send(orjson.dumps({"type": "error", "message": str(e)}))
     else:
-        await websocket.send(json.dumps({"type": "error", "message": f"Object '{object_name}' not found"}))
+        await websocket.send(orjson.dumps({"type": "error", "message": f"Object '{object_name}' not found"}))
 
 # async def send_game_info(websocket):
 #     info = {
@@ -98,11 +185,11 @@ async def toggle_object_visibility(websocket, object_name):
 #         "physics_debug": bge.logic.getCurrentScene().debugDraw,
 #         "mouse_visible": bge.logic.getCurrentScene().mouseCursor,
 #     }
-#     await websocket.send(json.dumps({"type": "game_info", "data": info}))
+#     await websocket.send(orjson.dumps({"type": "game_info", "data": info}))
 
 async def set_game_speed(websocket, speed):
     bge.logic.setTimeScale(float(speed))
-    await websocket.send(json.dumps({"type": "game_speed_updated", "speed": speed}))
+    await websocket.send(orjson.dumps({"type": "game_speed_updated", "speed": speed}))
 
 async def send_game_info(websocket):
     global mouse_visible
@@ -111,113 +198,130 @@ async def send_game_info(websocket):
         "game_speed": bge.logic.getTimeScale(),
         "mouse_visible": mouse_visible
     }
-    await websocket.send(json.dumps({"type": "game_info", "data": info}))
+    await websocket.send(orjson.dumps({"type": "game_info", "data": info}))
 
 async def toggle_mouse(websocket):
     global mouse_visible
     mouse_visible = not mouse_visible
     bge.render.showMouse(mouse_visible)
-    await websocket.send(json.dumps({"type": "mouse_visibility_updated", "visible": mouse_visible}))
+    await websocket.send(orjson.dumps({"type": "mouse_visibility_updated", "visible": mouse_visible}))
 
 async def toggle_physics_debug(websocket):
     # UPBGE doesn't have a built-in physics debug visualization
     # You might need to implement your own visualization method
     # For now, we'll just send a message that this feature is not available
-    await websocket.send(json.dumps({"type": "error", "message": "Physics debug visualization is not available in this version of UPBGE"}))
+    await websocket.send(PHYSICS_DEBUG_UNAVAILABLE_PAYLOAD)
 
 # async def toggle_mouse(websocket):
 #     scene = bge.logic.getCurrentScene()
 #     default_object = scene.objects['__default__']
 #     default_object.visible = not default_object.visible
 #     bge.render.showMouse(default_object.visible)
-#     await websocket.send(json.dumps({"type": "mouse_visibility_updated", "visible": default_object.visible}))
+#     await websocket.send(orjson.dumps({"type": "mouse_visibility_updated", "visible": default_object.visible}))
 
 async def restart_game(websocket):
+    # Cached objects and ids are stale after a restart
+    prop_name_cache.clear()
+    obj_by_name.clear()
     bge.logic.restartGame()
-    await websocket.send(json.dumps({"type": "game_restarted"}))
+    await websocket.send(GAME_RESTARTED_PAYLOAD)
 
 async def end_game(websocket):
     bge.logic.endGame()
-    await websocket.send(json.dumps({"type": "game_ended"}))
+    await websocket.send(GAME_ENDED_PAYLOAD)
 async def send_objects(websocket):
     scene = bge.logic.getCurrentScene()
     objects = [{"name": obj.name} for obj in scene.objects]
-    await websocket.send(json.dumps({"type": "objects", "data": objects}))
+    await websocket.send(encode_payload({"type": "objects", "data": objects}))
+
+def build_object_properties(obj):
+    # Each attribute access crosses the Python/BGE boundary and builds a
+    # fresh Vector/Euler, so read each one once
+    position = obj.worldPosition
+    rotation = obj.worldOrientation.to_euler()
+    scale = obj.worldScale
+    properties = {
+        "basic": {
+            "position": {
+                "x": truncate(position.x),
+                "y": truncate(position.y),
+                "z": truncate(position.z)
+            },
+            "rotation": {
+                "x": truncate(rotation.x * RAD2DEG),
+                "y": truncate(rotation.y * RAD2DEG),
+                "z": truncate(rotation.z * RAD2DEG)
+            },
+            "scale": {
+                "x": truncate(scale.x),
+                "y": truncate(scale.y),
+                "z": truncate(scale.z)
+            }
+        },
+        "physics": {"status": "Not applicable"},
+        "game": {},
+        "materials": []
+    }
+
+    # Physics properties (only if the object has physics)
+    if obj.getPhysicsId():
+        if hasattr(obj, 'mass') and hasattr(obj, 'linearVelocity') and hasattr(obj, 'angularVelocity'):
+            linear_velocity = obj.linearVelocity
+            angular_velocity = obj.angularVelocity
+            properties["physics"] = {
+                "mass": truncate(obj.mass),
+                "linearVelocity": {
+                    "x": truncate(linear_velocity.x),
+                    "y": truncate(linear_velocity.y),
+                    "z": truncate(linear_velocity.z)
+                },
+                "angularVelocity": {
+                    "x": truncate(angular_velocity.x),
+                    "y": truncate(angular_velocity.y),
+                    "z": truncate(angular_velocity.z)
+                }
+            }
+
+    # Game properties (name lists rarely change, so fetch them once
+    # per object instead of crossing into BGE every broadcast)
+    oid = id(obj)
+    names = prop_name_cache.get(oid)
+    if names is None:
+        names = prop_name_cache.setdefault(oid, tuple(obj.getPropertyNames()))
+    for key in names:
+        value = obj[key]
+        if isinstance(value, (int, float, bool, str)):
+            properties["game"][key] = truncate(value)
+        elif isinstance(value, (mathutils.Vector, mathutils.Euler)):
+            properties["game"][key] = {
+                "x": truncate(value.x),
+                "y": truncate(value.y),
+                "z": truncate(value.z)
+            }
+
+    # Materials (if the object has a mesh)
+    if hasattr(obj, 'meshes') and obj.meshes:
+        properties["materials"] = [mat.name for mat in obj.meshes[0].materials]
+    else:
+        properties["materials"] = ["Not applicable"]
+
+    return properties
 
 async def send_object_properties(websocket, object_name):
-    scene = bge.logic.getCurrentScene()
-    obj = scene.objects.get(object_name)
+    obj = get_object_by_name(object_name)
     if obj:
         try:
-            properties = {
-                "basic": {
-                    "position": {
-                        "x": truncate(obj.worldPosition.x),
-                        "y": truncate(obj.worldPosition.y),
-                        "z": truncate(obj.worldPosition.z)
-                    },
-                    "rotation": {
-                        "x": truncate(math.degrees(obj.worldOrientation.to_euler().x)),
-                        "y": truncate(math.degrees(obj.worldOrientation.to_euler().y)),
-                        "z": truncate(math.degrees(obj.worldOrientation.to_euler().z))
-                    },
-                    "scale": {
-                        "x": truncate(obj.worldScale.x),
-                        "y": truncate(obj.worldScale.y),
-                        "z": truncate(obj.worldScale.z)
-                    }
-                },
-                "physics": {"status": "Not applicable"},
-                "game": {},
-                "materials": []
-            }
-            
-            # Physics properties (only if the object has physics)
-            if obj.getPhysicsId():
-                if hasattr(obj, 'mass') and hasattr(obj, 'linearVelocity') and hasattr(obj, 'angularVelocity'):
-                    properties["physics"] = {
-                        "mass": truncate(obj.mass),
-                        "linearVelocity": {
-                            "x": truncate(obj.linearVelocity.x),
-                            "y": truncate(obj.linearVelocity.y),
-                            "z": truncate(obj.linearVelocity.z)
-                        },
-                        "angularVelocity": {
-                            "x": truncate(obj.angularVelocity.x),
-                            "y": truncate(obj.angularVelocity.y),
-                            "z": truncate(obj.angularVelocity.z)
-                        }
-                    }
-            
-            # Game properties
-            for key in obj.getPropertyNames():
-                value = obj[key]
-                if isinstance(value, (int, float, bool, str)):
-                    properties["game"][key] = truncate(value)
-                elif isinstance(value, (mathutils.Vector, mathutils.Euler)):
-                    properties["game"][key] = {
-                        "x": truncate(value.x),
-                        "y": truncate(value.y),
-                        "z": truncate(value.z)
-                    }
-            
-            # Materials (if the object has a mesh)
-            if hasattr(obj, 'meshes') and obj.meshes:
-                properties["materials"] = [mat.name for mat in obj.meshes[0].materials]
-            else:
-                properties["materials"] = ["Not applicable"]
-            
-            await websocket.send(json.dumps({"type": "object_properties", "data": properties}))
+            properties = build_object_properties(obj)
+            await websocket.send(encode_payload({"type": "object_properties", "data": properties}))
         except Exception as e:
             error_msg = f"Error processing object {object_name}: {str(e)}"
             print(error_msg)
-            await websocket.send(json.dumps({"type": "error", "message": error_msg}))
+            await websocket.send(orjson.dumps({"type": "error", "message": error_msg}))
     else:
-        await websocket.send(json.dumps({"type": "error", "message": f"Object '{object_name}' not found"})) 
+        await websocket.send(orjson.dumps({"type": "error", "message": f"Object '{object_name}' not found"}))
 
 async def update_object_property(websocket, data):
-    scene = bge.logic.getCurrentScene()
-    obj = scene.objects.get(data['object'])
+    obj = get_object_by_name(data['object'])
     if obj:
         try:
             property_name = data['property']
@@ -246,29 +350,80 @@ async def update_object_property(websocket, data):
                     new_value = new_value.lower() in ('true', '1', 'yes')
                 obj[property_name] = new_value
             
-            await websocket.send(json.dumps({"type": "update_success"}))
+            await websocket.send(UPDATE_SUCCESS_PAYLOAD)
         except Exception as e:
-            await websocket.send(json.dumps({"type": "error", "message": str(e)}))
+            await websocket.send(orjson.dumps({"type": "error", "message": str(e)}))
     else:
-        await websocket.send(json.dumps({"type": "error", "message": f"Object '{data['object']}' not found"}))
+        await websocket.send(orjson.dumps({"type": "error", "message": f"Object '{data['object']}' not found"}))
 
 async def broadcast_data():
+    global last_objects_hash, last_props, last_props_name
     while True:
         if clients:
             scene = bge.logic.getCurrentScene()
-            objects = [{"name": obj.name} for obj in scene.objects]
-            object_list_message = json.dumps({"type": "objects", "data": objects})
-            
-            # Broadcast object list
-            await asyncio.gather(*[client.send(object_list_message) for client in clients])
-            
-            # Broadcast selected object properties if one is selected
-            if selected_object:
-                await asyncio.gather(*[send_object_properties(client, selected_object) for client in clients])
-        
+
+            # One pass over scene.objects covers both the name list and
+            # the selected-object lookup
+            names = []
+            objs = []
+            selected_obj = None
+            for obj in scene.objects:
+                name = obj.name
+                names.append(name)
+                objs.append(obj)
+                if name == selected_object:
+                    selected_obj = obj
+
+            # Only broadcast the object list when it actually changed;
+            # new clients request it themselves via get_objects
+            names_hash = hash(tuple(names))
+            if names_hash != last_objects_hash:
+                last_objects_hash = names_hash
+                obj_by_name.clear()
+                obj_by_name.update(zip(names, objs))
+                OBJECTS_TMPL["data"] = [{"name": name} for name in names]
+                object_list_payload = encode_payload(OBJECTS_TMPL)
+                await broadcast_payload(object_list_payload)
+
+            # Broadcast selected object properties if one is selected;
+            # after the first full snapshot only changed fields go out
+            if selected_obj:
+                try:
+                    properties = build_object_properties(selected_obj)
+                    if selected_object == last_props_name and last_props:
+                        diff = diff_properties(last_props, properties)
+                        if diff:
+                            PROPERTIES_DELTA_TMPL["data"] = diff
+                            await broadcast_payload(encode_payload(PROPERTIES_DELTA_TMPL))
+                    else:
+                        PROPERTIES_TMPL["data"] = properties
+                        await broadcast_payload(encode_payload(PROPERTIES_TMPL))
+                    last_props = properties
+                    last_props_name = selected_object
+                except Exception as e:
+                    # The scene mutates on the main thread, so the selected
+                    # object can be freed mid-build; log it once and keep
+                    # ticking instead of letting the loop die
+                    error_msg = f"Error processing object {selected_object}: {str(e)}"
+                    if error_msg not in reported_errors:
+                        reported_errors.add(error_msg)
+                        print(error_msg)
+
         await asyncio.sleep(0.5)  # Update twice per second
 
 def find_free_port(start_port=8765, max_port=8865):
+    # Ask the kernel for a free port in one syscall
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(('', 0))
+        port = s.getsockname()[1]
+        s.close()
+        return port
+    except OSError:
+        pass
+
+    # Fall back to probing the fixed range
     for port in range(start_port, max_port):
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -290,7 +445,9 @@ def run_server():
         max_attempts = 5
         for attempt in range(max_attempts):
             try:
-                websocket_server = await websockets.serve(handle_client, "localhost", port)
+                # Compression is handled once per broadcast in encode_payload,
+                # so skip the per-client permessage-deflate
+                websocket_server = await websockets.serve(handle_client, "localhost", port, compression=None)
                 print(f"WebSocket server started on ws://localhost:{port}")
                 await broadcast_data()  # This will run indefinitely
                 break  # If successful, exit the loop
@@ -308,7 +465,18 @@ def run_server():
                 print(f"Unexpected error starting WebSocket server: {e}")
                 return
 
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        # uvloop is not available on Windows; stock asyncio works fine
+        pass
+
     new_loop = asyncio.new_event_loop()
+    # Eager tasks (Python 3.12+) run coroutines that finish synchronously
+    # without a trip through the scheduler
+    if hasattr(asyncio, 'eager_task_factory'):
+        new_loop.set_task_factory(asyncio.eager_task_factory)
     asyncio.set_event_loop(new_loop)
     try:
         new_loop.run_until_complete(server())